@@ -5,8 +5,26 @@ Características:
 - Convierte un archivo .xlsx individual o todos los .xlsx de una carpeta.
 - Soporta múltiples hojas: primera, todas, por nombre o por índice.
 - Opciones de separador, encoding, encabezados, index y sobreescritura.
+- Convierte varios archivos en paralelo (--jobs).
+- Copia las hojas fila a fila sin cargarlas en memoria (--engine streaming).
 - Manejo de errores claro (por ejemplo, dependencia openpyxl faltante).
 
+Formato de salida con --engine streaming (por defecto):
+- Los valores se escriben tal como están en las celdas, fila por fila; no se
+  infieren tipos por columna como hace pandas.
+- El encabezado es la primera fila sin cambios: las celdas vacías quedan
+  vacías y los nombres repetidos no se renombran (pandas escribe
+  "Unnamed: N" y "a.1").
+- Los float enteros se escriben como int (1.0 -> 1), aunque la columna tenga
+  celdas vacías (pandas escribiría 1.0).
+- Cada fecha con hora 00:00:00 se escribe como YYYY-MM-DD; las demás como
+  "YYYY-MM-DD HH:MM:SS" (pandas decide el formato para toda la columna).
+- Se descartan las filas vacías del final; una hoja vacía produce un CSV
+  vacío (solo el BOM con utf-8-sig).
+- Todas las filas tienen tantas columnas como la más ancha de la hoja, aunque
+  el .xlsx declare una dimensión falsa ("A1:A1") o no declare ninguna.
+Use --engine pandas para obtener exactamente la salida de pandas.to_csv.
+
 Uso rápido (PowerShell):
   # Convertir todos los .xlsx del directorio actual (primera hoja)
   python pasarxlsxacsv.py .
@@ -24,13 +42,51 @@ Uso rápido (PowerShell):
 from __future__ import annotations
 
 import argparse
+import codecs
+import csv
+import datetime as dt
+import os
+import re
 import sys
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import closing, contextmanager
 from pathlib import Path
-from typing import Iterable, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Buffer de escritura de los CSV (menos llamadas a write() en archivos grandes)
+CSV_BUFFER_SIZE = 4 << 20
+
+# Caracteres no válidos en el sufijo de hoja (\w incluye letras con tilde)
+_BAD_SUFFIX_CHARS = re.compile(r"[^\w-]")
+
+# Los archivos se convierten en paralelo; la salida por consola se serializa
+_OUTPUT_LOCK = threading.Lock()
+
+
+def default_jobs() -> int:
+    return min(8, os.cpu_count() or 4)
+
+
+def positive_int(value: str) -> int:
+    try:
+        n = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"no es un entero: {value!r}")
+    if n < 1:
+        raise argparse.ArgumentTypeError(f"debe ser mayor o igual a 1: {n}")
+    return n
+
+
+def oprint(*args, **kwargs):
+    with _OUTPUT_LOCK:
+        print(*args, **kwargs)
 
 
 def eprint(*args, **kwargs):
-    print(*args, file=sys.stderr, **kwargs)
+    with _OUTPUT_LOCK:
+        print(*args, file=sys.stderr, **kwargs)
 
 
 def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
@@ -92,30 +148,68 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
         action="store_true",
         help="Sobrescribir CSV si ya existe",
     )
+    parser.add_argument(
+        "--engine",
+        choices=("streaming", "pandas"),
+        default="streaming",
+        help=(
+            "Motor de conversión: 'streaming' copia fila a fila con memoria constante "
+            "y escribe los valores de cada celda sin inferir tipos ni renombrar "
+            "encabezados (formato descrito al inicio de pasarxlsxacsv.py); 'pandas' arma un "
+            "DataFrame por hoja y escribe con to_csv (siempre se usa con --index)"
+        ),
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=positive_int,
+        default=default_jobs(),
+        help="Cantidad de archivos a convertir en paralelo (solo cuando input es carpeta)",
+    )
     return parser.parse_args(argv)
 
 
+# Módulo pandas ya importado (se importa solo si el motor elegido lo necesita)
+_PD = None
+
+
 def ensure_pandas() -> Tuple[object, Optional[Exception]]:
+    global _PD
+    if _PD is not None:
+        return _PD, None
     try:
         import pandas as pd  # type: ignore
 
+        _PD = pd
         return pd, None
     except Exception as ex:  # pragma: no cover - entorno
         return None, ex
 
 
-def read_sheets_list(pd, xlsx_path: Path, sheets_opt: str) -> List[str]:
-    """Devuelve la lista de nombres de hoja a exportar según la opción."""
+def load_workbook_readonly(xlsx_path: Path):
+    """Abre el libro en modo solo lectura (streaming de filas con openpyxl)."""
     try:
-        xl = pd.ExcelFile(xlsx_path)
+        import openpyxl  # type: ignore
     except ImportError as ex:
         raise RuntimeError(
             "Falta el motor de Excel (openpyxl). Instala con: pip install openpyxl"
         ) from ex
+    try:
+        return openpyxl.load_workbook(
+            xlsx_path, read_only=True, data_only=True, keep_links=False
+        )
     except Exception as ex:
         raise RuntimeError(f"No se pudo abrir '{xlsx_path}': {ex}") from ex
 
-    all_names: List[str] = list(xl.sheet_names)
+
+def read_sheets_list(wb, xlsx_path: Path, sheets_opt: str) -> List[str]:
+    """Devuelve la lista de nombres de hoja a exportar según la opción.
+
+    `wb` es el libro ya abierto con `load_workbook_readonly`: aquí no se vuelve
+    a abrir el archivo ni se crea un `pd.ExcelFile` solo para leer los nombres.
+    """
+    # sheetnames ya devuelve una lista nueva en cada acceso; no hace falta copiarla
+    all_names: List[str] = wb.sheetnames
     if not all_names:
         raise RuntimeError(f"El archivo '{xlsx_path}' no tiene hojas.")
 
@@ -148,21 +242,146 @@ def read_sheets_list(pd, xlsx_path: Path, sheets_opt: str) -> List[str]:
     return result
 
 
-def safe_sheet_suffix(name: str) -> str:
-    # Sanitizar para nombre de archivo
-    keep = []
-    for ch in name:
-        if ch.isalnum() or ch in ("-", "_"):
-            keep.append(ch)
-        elif ch.isspace():
-            keep.append("_")
+class SheetReadError(Exception):
+    """Error al leer las filas de una hoja (no al escribir el CSV)."""
+
+
+class CsvWriteError(Exception):
+    """Error al escribir una fila en el CSV de salida."""
+
+
+def fix_sheet_dimensions(ws) -> Optional[int]:
+    """Devuelve el ancho (max_col) con que hay que leer las filas de la hoja.
+
+    Algunos generadores escriben una dimensión falsa ("A1:A1") o ninguna; en
+    modo solo lectura eso truncaría iter_rows, así que se descarta. Sin
+    dimensión, iter_rows tampoco rellena las filas cortas: en ese caso se
+    recorre la hoja una vez para conocer el ancho real y que todas las filas
+    del CSV tengan la misma cantidad de columnas.
+    """
+    try:
+        dim = ws.calculate_dimension()
+    except ValueError:
+        dim = None
+    if dim not in (None, "A1:A1"):
+        return None
+    ws.reset_dimensions()
+    width = max((len(row) for row in ws.iter_rows(values_only=True)), default=0)
+    return width or None
+
+
+def format_cell(value):
+    # Se formatea cada celda por separado: los float enteros pasan a int y
+    # las fechas con hora 00:00:00 se escriben como YYYY-MM-DD
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, dt.datetime):
+        if value.time() == dt.time(0):
+            return value.date().isoformat()
+        return value.isoformat(sep=" ")
+    return value
+
+
+@contextmanager
+def open_csv_output(out_path: Path, encoding: str, overwrite: bool = True):
+    """Abre el CSV de salida en modo texto con un buffer grande.
+
+    Con utf-8-sig el BOM se escribe una sola vez a mano y el resto va como
+    utf-8 plano, que es el camino rápido de escritura de pandas.
+    Se escribe en un archivo temporal de la misma carpeta que se renombra a
+    `out_path` solo si todo salió bien: un error a mitad de la hoja no deja un
+    CSV truncado que la siguiente ejecución daría por exportado.
+    Sin `overwrite` el nombre se reserva antes en modo "x": si el archivo ya
+    existe se lanza FileExistsError (comprobar y crear es una sola operación).
+    """
+    if not overwrite:
+        open(out_path, "x").close()
+    tmp_path = out_path.with_name(f".{out_path.name}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        if codecs.lookup(encoding).name == "utf-8-sig":
+            fh = open(
+                tmp_path, "x", encoding="utf-8", newline="", buffering=CSV_BUFFER_SIZE
+            )
+            fh.write("\ufeff")
         else:
-            keep.append("_")
-    return "".join(keep).strip("_")
+            fh = open(
+                tmp_path, "x", encoding=encoding, newline="", buffering=CSV_BUFFER_SIZE
+            )
+        with fh:
+            yield fh
+        os.replace(tmp_path, out_path)
+    except BaseException:
+        # Borrar el temporal y la reserva; el error original es el que importa
+        for leftover in (tmp_path,) if overwrite else (tmp_path, out_path):
+            try:
+                leftover.unlink()
+            except OSError:
+                pass
+        raise
+
+
+def stream_sheet_to_csv(
+    ws,
+    out_path: Path,
+    sep: str,
+    encoding: str,
+    header: bool,
+    overwrite: bool = True,
+) -> None:
+    """Copia las filas de la hoja directamente al CSV, sin construir un DataFrame.
+
+    Solo se mantiene una fila en memoria a la vez, sin importar el tamaño de la hoja.
+    Los errores al leer la hoja se lanzan como SheetReadError y los de
+    escritura como CsvWriteError.
+    El formato resultante (distinto del de pandas en encabezados, tipos y fechas)
+    está descrito en el docstring del módulo.
+    """
+    try:
+        rows = ws.iter_rows(values_only=True, max_col=fix_sheet_dimensions(ws))
+    except Exception as ex:
+        raise SheetReadError(str(ex)) from ex
+    with open_csv_output(out_path, encoding, overwrite) as fh:
+        writer = csv.writer(fh, delimiter=sep, lineterminator=os.linesep)
+        # Un solo try para toda la lectura; las escrituras llevan el suyo para
+        # distinguir los errores del .xlsx de los del CSV
+        try:
+            # La primera fila se trata como encabezado: se escribe tal cual o se omite
+            first = next(rows, None)
+            if first is not None and header:
+                try:
+                    writer.writerow([format_cell(v) for v in first])
+                except Exception as ex:
+                    raise CsvWriteError(str(ex)) from ex
+            # Las filas vacías se retienen hasta ver una con datos, para
+            # descartar las del final
+            blank_rows = 0
+            blank_row: tuple = ()
+            for row in rows:
+                if all(v is None for v in row):
+                    blank_rows += 1
+                    blank_row = row
+                    continue
+                try:
+                    for _ in range(blank_rows):
+                        writer.writerow(blank_row)
+                    writer.writerow([format_cell(v) for v in row])
+                except Exception as ex:
+                    raise CsvWriteError(str(ex)) from ex
+                blank_rows = 0
+        except CsvWriteError:
+            raise
+        except Exception as ex:
+            raise SheetReadError(str(ex)) from ex
+
+
+def safe_sheet_suffix(name: str) -> str:
+    # Sanitizar para nombre de archivo: todo lo que no sea alfanumérico, "-" o "_"
+    return _BAD_SUFFIX_CHARS.sub("_", name).strip("_")
 
 
 def convert_xlsx_to_csv(
     pd,
+    wb,
     xlsx_path: Path,
     out_dir: Path,
     sheets: List[str],
@@ -171,15 +390,51 @@ def convert_xlsx_to_csv(
     header: bool = True,
     index: bool = False,
     overwrite: bool = False,
+    engine: str = "streaming",
 ) -> List[Path]:
     out_dir.mkdir(parents=True, exist_ok=True)
     created: List[Path] = []
     multiple = len(sheets) > 1
     base = xlsx_path.stem
+    xl = None
 
     for sheet_name in sheets:
+        suffix = f"_{safe_sheet_suffix(sheet_name)}" if multiple else ""
+        out_path = out_dir / f"{base}{suffix}.csv"
+
+        if out_path.exists() and not overwrite:
+            eprint(f"Omitido (ya existe): {out_path}")
+            continue
+
+        # El índice solo tiene sentido con un DataFrame; en ese caso se usa pandas
+        if engine == "streaming" and not index:
+            try:
+                ws = wb[sheet_name]
+            except Exception as ex:
+                raise RuntimeError(
+                    f"No se pudo leer la hoja '{sheet_name}' de '{xlsx_path}': {ex}"
+                ) from ex
+            try:
+                stream_sheet_to_csv(ws, out_path, sep, encoding, header, overwrite)
+            except FileExistsError:
+                # Otro archivo lo creó entre la comprobación y la apertura
+                eprint(f"Omitido (ya existe): {out_path}")
+                continue
+            except SheetReadError as ex:
+                raise RuntimeError(
+                    f"No se pudo leer la hoja '{sheet_name}' de '{xlsx_path}': {ex}"
+                ) from ex
+            except Exception as ex:
+                raise RuntimeError(f"No se pudo escribir '{out_path}': {ex}") from ex
+            oprint(f"✔ Exportado: {out_path}")
+            created.append(out_path)
+            continue
+
         try:
-            df = pd.read_excel(xlsx_path, sheet_name=sheet_name)
+            # Reutiliza el libro ya abierto en lugar de reabrir el .xlsx por hoja
+            if xl is None:
+                xl = pd.ExcelFile(wb, engine="openpyxl")
+            df = xl.parse(sheet_name)
         except ImportError as ex:
             raise RuntimeError(
                 "Falta el motor de Excel (openpyxl). Instala con: pip install openpyxl"
@@ -189,67 +444,117 @@ def convert_xlsx_to_csv(
                 f"No se pudo leer la hoja '{sheet_name}' de '{xlsx_path}': {ex}"
             ) from ex
 
-        suffix = f"_{safe_sheet_suffix(sheet_name)}" if multiple else ""
-        out_path = out_dir / f"{base}{suffix}.csv"
-
-        if out_path.exists() and not overwrite:
+        try:
+            with open_csv_output(out_path, encoding, overwrite) as fh:
+                df.to_csv(fh, sep=sep, header=header, index=index)
+        except FileExistsError:
             eprint(f"Omitido (ya existe): {out_path}")
             continue
-
-        try:
-            df.to_csv(out_path, sep=sep, encoding=encoding, header=header, index=index)
         except Exception as ex:
             raise RuntimeError(f"No se pudo escribir '{out_path}': {ex}") from ex
 
-        print(f"✔ Exportado: {out_path}")
+        oprint(f"✔ Exportado: {out_path}")
         created.append(out_path)
 
     return created
 
 
 def iter_xlsx_files(root: Path, recursive: bool = False) -> Iterable[Path]:
-    pattern = "**/*.xlsx" if recursive else "*.xlsx"
-    for p in root.glob(pattern):
-        # Omitir archivos temporales de Excel (~$Nombre.xlsx)
-        if p.name.startswith("~$"):
+    # os.scandir en lugar de Path.glob: el tipo de cada entrada viene del propio
+    # listado (sin stat() extra) y solo se crea un Path para los .xlsx
+    pending = [os.fspath(root)]
+    while pending:
+        try:
+            it = os.scandir(pending.pop())
+        except OSError:
+            # Carpetas sin permiso (o que ya no existen) se omiten, como en Path.glob
             continue
-        if p.is_file():
-            yield p
+        with it:
+            for entry in it:
+                name = entry.name
+                if recursive and entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                    continue
+                # Omitir archivos temporales de Excel (~$Nombre.xlsx)
+                if name.startswith("~$") or not name.lower().endswith(".xlsx"):
+                    continue
+                if entry.is_file():
+                    yield Path(entry.path)
+
+
+def group_files_by_output(
+    files: List[Path], out_dir: Optional[Path]
+) -> List[List[Path]]:
+    """Agrupa los archivos que podrían escribir el mismo CSV.
+
+    Los CSV se llaman `<nombre>.csv` o `<nombre>_<hoja>.csv`, así que dos
+    archivos con la misma carpeta destino chocan si tienen el mismo nombre base
+    o si uno empieza con el del otro seguido de "_" (a.xlsx con la hoja "b" y
+    a_b.xlsx escriben los dos a_b.csv). Cada grupo se arma bajo el nombre más
+    corto de la cadena y conserva el orden de `files`, para procesarlo en orden
+    dentro del mismo trabajo como en la versión secuencial.
+    """
+    keys = [
+        (
+            os.path.normcase(os.path.abspath(out_dir or xlsx.parent)),
+            os.path.normcase(xlsx.stem),
+        )
+        for xlsx in files
+    ]
+    known = set(keys)
+    groups: Dict[Tuple[str, str], List[Path]] = {}
+    for xlsx, (folder, stem) in zip(files, keys):
+        root = stem
+        cut = stem.find("_")
+        while cut != -1:
+            if (folder, stem[:cut]) in known:
+                root = stem[:cut]
+                break
+            cut = stem.find("_", cut + 1)
+        groups.setdefault((folder, root), []).append(xlsx)
+    return list(groups.values())
 
 
 def main(argv: Optional[List[str]] = None) -> int:
     args = parse_args(argv)
-    pd, err = ensure_pandas()
-    if err is not None:
-        eprint("Error: pandas no disponible. Instala con: pip install pandas")
-        eprint(str(err))
-        return 2
 
     in_path = Path(args.input)
     if not in_path.exists():
         eprint(f"No existe la ruta: {in_path}")
         return 2
+    if in_path.is_file() and in_path.suffix.lower() != ".xlsx":
+        eprint(f"El archivo no es .xlsx: {in_path}")
+        return 2
+
+    # pandas solo hace falta para el motor 'pandas' o para exportar el índice
+    pd = None
+    if args.engine == "pandas" or args.index:
+        pd, err = ensure_pandas()
+        if err is not None:
+            eprint("Error: pandas no disponible. Instala con: pip install pandas")
+            eprint(str(err))
+            return 2
 
     out_dir = Path(args.output) if args.output else None
 
     try:
         if in_path.is_file():
-            if in_path.suffix.lower() != ".xlsx":
-                eprint(f"El archivo no es .xlsx: {in_path}")
-                return 2
-            sheets = read_sheets_list(pd, in_path, args.sheets)
             target_dir = out_dir or in_path.parent
-            convert_xlsx_to_csv(
-                pd,
-                in_path,
-                target_dir,
-                sheets,
-                sep=args.sep,
-                encoding=args.encoding,
-                header=args.header,
-                index=args.index,
-                overwrite=args.overwrite,
-            )
+            with closing(load_workbook_readonly(in_path)) as wb:
+                sheets = read_sheets_list(wb, in_path, args.sheets)
+                convert_xlsx_to_csv(
+                    pd,
+                    wb,
+                    in_path,
+                    target_dir,
+                    sheets,
+                    sep=args.sep,
+                    encoding=args.encoding,
+                    header=args.header,
+                    index=args.index,
+                    overwrite=args.overwrite,
+                    engine=args.engine,
+                )
         else:
             files = list(iter_xlsx_files(in_path, recursive=args.recursive))
             if not files:
@@ -257,13 +562,15 @@ def main(argv: Optional[List[str]] = None) -> int:
                 return 1
             print(f"Encontrados {len(files)} archivos .xlsx")
 
-            for xlsx in files:
-                try:
-                    sheets = read_sheets_list(pd, xlsx, args.sheets)
-                    # Si no se especificó salida, dejar CSV junto al archivo origen
-                    target_dir = out_dir or xlsx.parent
-                    convert_xlsx_to_csv(
+            def convert_one(xlsx: Path) -> List[Path]:
+                # Si no se especificó salida, dejar CSV junto al archivo origen
+                target_dir = out_dir or xlsx.parent
+                # El libro se abre una sola vez para listar y exportar sus hojas
+                with closing(load_workbook_readonly(xlsx)) as wb:
+                    sheets = read_sheets_list(wb, xlsx, args.sheets)
+                    return convert_xlsx_to_csv(
                         pd,
+                        wb,
                         xlsx,
                         target_dir,
                         sheets,
@@ -272,10 +579,36 @@ def main(argv: Optional[List[str]] = None) -> int:
                         header=args.header,
                         index=args.index,
                         overwrite=args.overwrite,
+                        engine=args.engine,
                     )
-                except Exception as ex:
-                    eprint(f"Error con '{xlsx}': {ex}")
-                    # Continuar con el siguiente archivo
+
+            # Se activa con Ctrl+C para que los trabajos no empiecen otro archivo
+            stop = threading.Event()
+
+            def convert_group(group: List[Path]) -> None:
+                for xlsx in group:
+                    if stop.is_set():
+                        return
+                    try:
+                        convert_one(xlsx)
+                    except Exception as ex:
+                        eprint(f"Error con '{xlsx}': {ex}")
+                        # Continuar con el siguiente archivo
+
+            groups = group_files_by_output(files, out_dir)
+
+            pool = ThreadPoolExecutor(max_workers=args.jobs)
+            try:
+                futures = [pool.submit(convert_group, g) for g in groups]
+                for future in as_completed(futures):
+                    future.result()
+            except KeyboardInterrupt:
+                # Sin esto el bloque del pool esperaría a que terminen todos los grupos
+                stop.set()
+                pool.shutdown(wait=False, cancel_futures=True)
+                eprint("Interrumpido: se terminan solo los archivos en curso.")
+                return 130
+            pool.shutdown()
             print("Proceso finalizado.")
     except RuntimeError as ex:
         eprint(str(ex))
@@ -1,8 +1,18 @@
+import bisect
+import functools
 import os
-import re
+import sys
 from pathlib import Path
 import unicodedata
 
+
+def _norm(s):
+    """Normalizar para comparar sin tildes ni mayúsculas."""
+    s2 = unicodedata.normalize('NFD', s)
+    s2 = ''.join(c for c in s2 if unicodedata.category(c) != 'Mn')
+    return s2.lower()
+
+
 class Menu():
     """Interactive menu to navigate the project markdown documentation.
 
@@ -16,6 +26,8 @@ class Menu():
         self.base_dir = os.path.dirname(os.path.abspath(__file__))
         self.doc_path = os.path.join(self.base_dir, "documentacion.md")
         self.self_path = os.path.abspath(__file__)
+        # Limpiar con secuencias ANSI evita lanzar un proceso en cada redibujado
+        self._ansi_enabled = self.enable_ansi()
 
         if not os.path.exists(self.doc_path):
             print("Error: No se encontró el archivo 'documentacion.md'.")
@@ -23,47 +35,142 @@ class Menu():
             raise OSError("documentacion.md no encontrado en: {}".format(self.doc_path))
 
         try:
-            self.lines = self.read_lines(Path(self.doc_path))
+            # Se guarda el contenido crudo: solo se decodifica lo que se muestra
+            self.raw_bytes = Path(self.doc_path).read_bytes()
+            # Se valida el UTF-8 una sola vez al cargar: así los tramos que se
+            # decodifican después (cortados en finales de línea) no pueden fallar
+            self.raw_bytes.decode("utf-8")
         except Exception as e:
             # Bubble up a descriptive error
             raise IOError(f"Error leyendo {self.doc_path}: {e}")
-        self.paras = self.all_paragraphs(self.lines)
+        self.line_offsets = self.scan_line_offsets(self.raw_bytes)
+        self.n_lines = len(self.line_offsets) - 1
+        # El documento no cambia tras cargarse: los encabezados se calculan una vez
+        self.headings = self.scan_headings(self.raw_bytes, self.line_offsets)
+        # Títulos ya normalizados (sin tildes, en minúsculas) para las búsquedas
+        self.norm_headings = [(idx, level, title, _norm(title)) for idx, level, title in self.headings]
+        # Para cada encabezado, línea donde termina su sección (O(1) por consulta)
+        self.section_end = self.section_ends(self.headings, self.n_lines)
 
     ''' HELPER FUNCTIONS
     '''
 
+    def enable_ansi(self):
+        """Return True if the terminal accepts ANSI escape sequences.
+
+        On Windows 10+ an empty os.system call switches the console to VT mode.
+        """
+        if not sys.stdout.isatty():
+            return False
+        if os.name == 'nt':
+            if sys.getwindowsversion().major < 10:
+                return False
+            os.system('')
+        return True
+
     def limpiar_terminal(self):
-        os.system('cls' if os.name == 'nt' else 'clear')
+        if self._ansi_enabled:
+            # Misma secuencia que emite `clear`: cursor al inicio, pantalla e historial
+            sys.stdout.write("\x1b[H\x1b[2J\x1b[3J")
+            sys.stdout.flush()
+        else:
+            os.system('cls' if os.name == 'nt' else 'clear')
 
-    def read_lines(self, path):
-        """Return the file content as a list of lines using UTF-8 encoding.
+    @functools.cached_property
+    def lines(self):
+        """Decoded document lines (tuple), built on first access.
 
-        Raises
-        ------
-        IOError: if the file cannot be read.
+        Lines are split on '\\n' only, so indexes match `line_offsets`.
         """
-        try:
-            return path.read_text(encoding="utf-8").splitlines()
-        except Exception as e:
-            raise IOError(f"No se pudo leer el archivo {path}: {e}")
+        text = self.decode_range(0, self.n_lines)
+        if not text:
+            return ()
+        return tuple(text[:-1].split("\n") if text.endswith("\n") else text.split("\n"))
+
+    @functools.cached_property
+    def paras(self):
+        """Paragraphs of the whole document, built on first access."""
+        return self.all_paragraphs(self.lines)
+
+    def decode_range(self, a, b):
+        """Return lines [a, b) of the document decoded as UTF-8 ('\\n' endings)."""
+        text = self.raw_bytes[self.line_offsets[a]:self.line_offsets[b]].decode("utf-8")
+        return text.replace("\r\n", "\n") if "\r" in text else text
+
+    def scan_line_offsets(self, raw):
+        """Return the byte offset where each line starts, plus len(raw) at the end.
+
+        Uses bytes.find (memchr) instead of splitting the decoded text.
+        """
+        offsets = [0]
+        pos = raw.find(b"\n")
+        while pos != -1:
+            offsets.append(pos + 1)
+            pos = raw.find(b"\n", pos + 1)
+        if offsets[-1] != len(raw):
+            offsets.append(len(raw))
+        return offsets
+
+    def scan_headings(self, raw, offsets):
+        """Same as parse_headings, but over the raw bytes of the document.
+
+        Only lines starting with b'#' are visited (found with bytes.find) and
+        only their titles are decoded.
+        """
+        headings = []
+        pos = 0 if raw.startswith(b"#") else raw.find(b"\n#")
+        while pos != -1:
+            start = pos if raw[pos:pos + 1] == b"#" else pos + 1
+            i = bisect.bisect_right(offsets, start) - 1
+            ln = raw[start:offsets[i + 1]]
+            n = 0
+            while n < 6 and n < len(ln) and ln[n:n + 1] == b"#":
+                n += 1
+            if ln[n:n + 1] in (b" ", b"\t"):
+                headings.append((i, n, ln[n:].decode("utf-8").strip()))
+            pos = raw.find(b"\n#", start)
+        return headings
 
     def parse_headings(self, lines):
-        """Return list of (line_no, level, title)."""
+        """Return list of (line_no, level, title).
+
+        A heading is 1 to 6 '#' followed by a space or tab (plain prefix
+        checks, no regex per line).
+        """
         headings = []
         for i, ln in enumerate(lines):
-            m = re.match(r'^(#{1,6})\s*(.+)$', ln)
-            if m:
-                level = len(m.group(1))
-                title = m.group(2).strip()
-                headings.append((i, level, title))
+            if not ln.startswith('#'):
+                continue
+            n = 0
+            while n < 6 and n < len(ln) and ln[n] == '#':
+                n += 1
+            if n < len(ln) and ln[n] in ' \t':
+                headings.append((i, n, ln[n:].strip()))
         return headings
     
+    def section_ends(self, headings, total):
+        """Return, for each heading, the line where its section ends.
+
+        The end is the next heading of the same or higher level (or `total`).
+        Computed with a single reverse pass over the headings.
+        """
+        ends = [total] * len(headings)
+        stack = []  # (level, line_no) of later headings, levels increasing downward
+        for pos in range(len(headings) - 1, -1, -1):
+            idx, level = headings[pos][0], headings[pos][1]
+            while stack and stack[-1][0] > level:
+                stack.pop()
+            if stack:
+                ends[pos] = stack[-1][1]
+            stack.append((level, idx))
+        return ends
+
     def all_paragraphs(self, lines):
         """Return list of paragraphs across the whole document (headings excluded)."""
         paras = []
         buf = []
         for ln in lines:
-            if re.match(r'^(#{1,6})\s*', ln):
+            if ln.startswith('#') and ln[1:2] in ('', '#', ' ', '\t'):
                 continue
             if ln.strip() == "":
                 if buf:
@@ -75,19 +182,44 @@ class Menu():
             paras.append("\n".join(buf).strip())
         return paras
 
-    def get_section(self, lines, title_search):
-        """Find section whose title contains title_search (case-insensitive)."""
-        headings = self.parse_headings(lines)
-        for idx, level, title in headings:
-            if title_search.lower() in title.lower():
+    @functools.lru_cache(maxsize=32)
+    def _section_text(self, a, b):
+        """Return lines[a:b] of the document joined and stripped (cached).
+
+        Only that byte range of the file is decoded.
+        """
+        return self.decode_range(a, b).strip()
+
+    def section_bounds(self, title_search, lines=None):
+        """Return (start, end) of the body of the first section whose title
+        contains title_search (case- and accent-insensitive), or None.
+
+        Without `lines` the loaded document is searched.
+        """
+        search = _norm(title_search)
+        if lines is None:
+            for pos, (idx, _, _, n) in enumerate(self.norm_headings):
+                if search in n:
+                    return idx + 1, self.section_end[pos]
+            return None
+        headings = [(i, lv, t, _norm(t)) for i, lv, t in self.parse_headings(lines)]
+        for idx, level, _, n in headings:
+            if search in n:
                 start = idx + 1
                 end = len(lines)
-                for idx2, level2, _ in headings:
+                for idx2, level2, _, _ in headings:
                     if idx2 > idx and level2 <= level:
                         end = idx2
                         break
-                return lines[start:end]
-        return []
+                return start, end
+        return None
+
+    def get_section(self, lines, title_search):
+        """Find section whose title contains title_search (case- and accent-insensitive)."""
+        bounds = self.section_bounds(title_search, None if lines is self.lines else lines)
+        if bounds is None:
+            return []
+        return list(lines[bounds[0]:bounds[1]])
 
     def extract_code_block(self, lines):
         """Extrae el bloque de código contenido entre ``` ... ```"""
@@ -135,11 +267,11 @@ class Menu():
 
         Si la sección no existe, muestra un mensaje informativo.
         """
-        sec_lines = self.get_section(self.lines, "Información general")
-        if not sec_lines:
+        bounds = self.section_bounds("Información general")
+        if bounds is None or bounds[0] >= bounds[1]:
             self.show_text("No se encontró la sección 'Información general' en el documento.")
             return
-        text = "\n".join(sec_lines).strip()
+        text = self._section_text(*bounds)
         self.show_text(text)
 
     def dataset(self):
@@ -147,6 +279,19 @@ class Menu():
 
         Esta función maneja entradas inválidas y permite regresar con Enter.
         """
+        # Los encabezados de referencia se buscan una sola vez, fuera del bucle
+        ds_idx = None
+        tabla_idx = None
+        prog_idx = None
+        for idx, level, _, n in self.norm_headings:
+            if ds_idx is None and level == 2 and 'dataset' in n and 'referenc' in n:
+                ds_idx = idx
+            if tabla_idx is None and level == 3 and 'tabla' in n and 'clientes' in n:
+                tabla_idx = idx
+            if prog_idx is None and level == 2 and 'programa' in n and 'interact' in n:
+                # first level-2 match for 'Programa Interactivo'
+                prog_idx = idx
+
         while True:
             self.limpiar_terminal()
             print("\nSubmenú de Dataset:")
@@ -158,22 +303,6 @@ class Menu():
             if choice == "a":
                 # Mostrar desde el encabezado nivel 2 'Dataset de referencia'
                 # hasta antes del encabezado nivel 3 'Tabla clientes' (incluyendo encabezados)
-                headings = self.parse_headings(self.lines)
-
-                def _norm(s):
-                    s2 = unicodedata.normalize('NFD', s)
-                    s2 = ''.join(c for c in s2 if unicodedata.category(c) != 'Mn')
-                    return s2.lower()
-
-                ds_idx = None
-                tabla_idx = None
-                for idx, level, title in headings:
-                    n = _norm(title)
-                    if ds_idx is None and level == 2 and 'dataset' in n and 'referenc' in n:
-                        ds_idx = idx
-                    if tabla_idx is None and level == 3 and 'tabla' in n and 'clientes' in n:
-                        tabla_idx = idx
-
                 if ds_idx is None:
                     self.show_text("No se encontró la sección 'Dataset de referencia' en el documento.")
                     continue
@@ -181,37 +310,18 @@ class Menu():
                     self.show_text("No se encontró el subtítulo 'Tabla clientes' después de 'Dataset de referencia'.")
                     continue
 
-                out_lines = self.lines[ds_idx:tabla_idx]
-                self.show_text("\n".join(out_lines).strip())
+                self.show_text(self._section_text(ds_idx, tabla_idx))
 
             elif choice == "b":
                 # Mostrar desde el subtítulo nivel 3 'Tabla clientes' hasta antes del
                 # subtítulo nivel 2 'Programa Interactivo' (incluyendo encabezados)
-                headings = self.parse_headings(self.lines)
-
-                def _norm(s):
-                    s2 = unicodedata.normalize('NFD', s)
-                    s2 = ''.join(c for c in s2 if unicodedata.category(c) != 'Mn')
-                    return s2.lower()
-
-                tabla_idx = None
-                prog_idx = None
-                for idx, level, title in headings:
-                    n = _norm(title)
-                    if tabla_idx is None and level == 3 and 'tabla' in n and 'clientes' in n:
-                        tabla_idx = idx
-                    if prog_idx is None and level == 2 and 'programa' in n and 'interact' in n:
-                        # first level-2 match for 'Programa Interactivo' after tabla
-                        prog_idx = idx
-
                 if tabla_idx is None:
                     self.show_text("No se encontró el subtítulo 'Tabla clientes' en el documento.")
                     continue
 
                 # Si no se encontró 'Programa Interactivo' después, tomar hasta el final
-                end_idx = prog_idx if (prog_idx and prog_idx > tabla_idx) else len(self.lines)
-                out_lines = self.lines[tabla_idx:end_idx]
-                self.show_text("\n".join(out_lines).strip())
+                end_idx = prog_idx if (prog_idx and prog_idx > tabla_idx) else self.n_lines
+                self.show_text(self._section_text(tabla_idx, end_idx))
 
             elif choice == "":
                 return
@@ -221,11 +331,11 @@ class Menu():
 
         No falla si la sección no existe (silencioso).
         """
-        sec_lines = self.get_section(self.lines, "Pasos")
-        if not sec_lines:
+        bounds = self.section_bounds("Pasos")
+        if bounds is None or bounds[0] >= bounds[1]:
             self.show_text("No se encontró la sección 'Pasos' en el documento.")
             return
-        text = "\n".join(sec_lines).strip()
+        text = self._section_text(*bounds)
         if text:
             self.show_text(text)
 
@@ -235,35 +345,23 @@ class Menu():
         'Pseudocódigo' y 'Diagrama' (incluyendo sus propias líneas de
         encabezado) desde el documento.
         """
-        headings = self.parse_headings(self.lines)
+        headings = self.norm_headings
         if not headings:
             self.show_text("No se encontraron encabezados en el documento.")
             return
 
-        # Normalizar para comparar sin tildes
-        def _norm(s):
-            s2 = unicodedata.normalize('NFD', s)
-            s2 = ''.join(c for c in s2 if unicodedata.category(c) != 'Mn')
-            return s2.lower()
-
         terms = ["pseudocodigo", "diagrama"]
         sections = []
 
-        for idx, level, title in headings:
+        for pos, (idx, level, _, low_title) in enumerate(headings):
             # Buscamos subtítulos de nivel 3 que contengan los términos
             if level != 3:
                 continue
-            low_title = _norm(title)
             if any(t in low_title for t in terms):
                 # Incluir la línea de encabezado (start = idx)
                 start = idx
-                end = len(self.lines)
-                for idx2, level2, _ in headings:
-                    if idx2 > idx and level2 <= level:
-                        end = idx2
-                        break
-                section_lines = self.lines[start:end]
-                sections.append("\n".join(section_lines).strip())
+                end = self.section_end[pos]
+                sections.append(self._section_text(start, end))
 
         if sections:
             # Mostrar las secciones encontradas, manteniendo títulos y formato
@@ -274,52 +372,34 @@ class Menu():
 
     def sugerencias_copilot(self):
         # Buscamos la sección completa incluyendo su encabezado
-        headings = self.parse_headings(self.lines)
-        target_idx = None
-        for idx, level, title in headings:
-            if "sugerencias copilot" in title.lower():
-                target_idx = idx
-                target_level = level
+        headings = self.norm_headings
+        target_pos = None
+        for pos, (idx, level, _, n) in enumerate(headings):
+            if "sugerencias copilot" in n:
+                target_pos = pos
                 break
 
-        if target_idx is None:
+        if target_pos is None:
             self.show_text("No se encontró la sección 'Sugerencias Copilot'.")
             return
 
-        start = target_idx
-        end = len(self.lines)
-        for idx2, level2, _ in headings:
-            if idx2 > start and level2 <= target_level:
-                end = idx2
-                break
-
-        # Normalizar función interna para comparaciones sin tildes
-        def _norm(s):
-            s2 = unicodedata.normalize('NFD', s)
-            s2 = ''.join(c for c in s2 if unicodedata.category(c) != 'Mn')
-            return s2.lower()
+        start = headings[target_pos][0]
+        end = self.section_end[target_pos]
 
         # Recolectar subsecciones nivel 2 y 3 dentro del rango [start, end)
         sections = []
-        # Build a list of headings within the doc for quick lookup
-        for idx, level, title in headings:
+        for pos, (idx, level, _, _) in enumerate(headings):
             if idx < start or idx >= end:
                 continue
             if level in (2, 3):
-                # compute subsection end
+                # subsection end, clipped to the enclosing section
                 sub_start = idx
-                sub_end = end
-                for idx2, level2, _ in headings:
-                    if idx2 > idx and idx2 < end and level2 <= level:
-                        sub_end = idx2
-                        break
-                section_lines = self.lines[sub_start:sub_end]
-                sections.append("\n".join(section_lines).strip())
+                sub_end = min(self.section_end[pos], end)
+                sections.append(self._section_text(sub_start, sub_end))
 
         # If no level 2/3 headings found, fallback to show whole section (including header)
         if not sections:
-            sec = self.lines[start:end]
-            out = "\n".join(sec).strip()
+            out = self._section_text(start, end)
             self.show_text(out if out else "No hay contenido en 'Sugerencias Copilot'.")
             return
 